@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from httpx import AsyncClient
+from fastapi.responses import JSONResponse, StreamingResponse
+from httpx import AsyncClient, Limits, Timeout
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
@@ -11,15 +12,26 @@ USERS_BASE_URL = os.getenv("USERS_BASE_URL", "http://users:8080")
 ORDERS_BASE_URL = os.getenv("ORDERS_BASE_URL", "http://orders:8080")
 PAYMENTS_BASE_URL = os.getenv("PAYMENTS_BASE_URL", "http://payments:8080")
 
+# Each open event stream pins an upstream connection for its whole lifetime
+MAX_EVENT_STREAMS = int(os.getenv("MAX_EVENT_STREAMS", "100"))
+
 
 # -----------------------------
-# Lifecycle: shared HTTP client
+# Lifecycle: shared HTTP clients
 # -----------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.http = AsyncClient(timeout=15)
+    # Streams get their own pool so they can never starve the request/response routes
+    app.state.stream_http = AsyncClient(
+        # Streams idle between heartbeats, so only bound the connect phase
+        timeout=Timeout(15, read=None),
+        limits=Limits(max_connections=MAX_EVENT_STREAMS, max_keepalive_connections=0),
+    )
+    app.state.stream_slots = asyncio.Semaphore(MAX_EVENT_STREAMS)
     yield
     await app.state.http.aclose()
+    await app.state.stream_http.aclose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -61,6 +73,63 @@ async def _forward(req: Request, base: str, suffix: str):
         return JSONResponse(status_code=resp.status_code, content=resp.text)
 
 
+class _RelayResponse(StreamingResponse):
+    """StreamingResponse that runs cleanup however the stream ends, even before the first chunk."""
+
+    def __init__(self, *args, on_close, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.on_close()
+
+
+async def _forward_stream(req: Request, base: str, suffix: str):
+    """Relay a long-lived streaming response (e.g. SSE) chunk by chunk, without buffering."""
+
+    slots = app.state.stream_slots
+    if slots.locked():
+        return JSONResponse(status_code=503, content={"detail": "Too many open event streams"})
+
+    url = f"{base}{suffix}"
+    headers = {k: v for k, v in req.headers.items() if k.lower() not in ("host", "accept-encoding")}
+    # Chunks are relayed raw, so ask upstream not to compress them
+    headers["accept-encoding"] = "identity"
+    upstream = app.state.stream_http.build_request("GET", url, headers=headers, params=req.query_params)
+
+    await slots.acquire()
+    try:
+        resp = await app.state.stream_http.send(upstream, stream=True)
+    except BaseException:
+        slots.release()
+        raise
+
+    async def close():
+        await resp.aclose()
+        slots.release()
+
+    if resp.status_code != 200:
+        await resp.aread()
+        await close()
+        try:
+            data = resp.json() if resp.content else None
+            return JSONResponse(status_code=resp.status_code, content=data)
+        except Exception:
+            return JSONResponse(status_code=resp.status_code, content=resp.text)
+
+    # Closes upstream and frees the slot even when the client disconnects mid-stream
+    return _RelayResponse(
+        resp.aiter_raw(),
+        status_code=resp.status_code,
+        media_type=resp.headers.get("content-type", "text/event-stream"),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        on_close=close,
+    )
+
+
 # -----------------------------
 # Users Routes
 # -----------------------------
@@ -96,6 +165,10 @@ async def payments_root(req: Request):
 async def payments_by_id(pid: int, req: Request):
     return await _forward(req, PAYMENTS_BASE_URL, f"/payments/{pid}")
 
+@app.get("/payments/{pid}/events")
+async def payments_events(pid: int, req: Request):
+    return await _forward_stream(req, PAYMENTS_BASE_URL, f"/payments/{pid}/events")
+
 
 # -----------------------------
 # Prometheus Metrics
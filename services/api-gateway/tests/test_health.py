@@ -1,8 +1,10 @@
+import asyncio
 import pytest
 import respx
 import httpx
 from httpx import AsyncClient
 from asgi_lifespan import LifespanManager
+from app import main as gateway
 from app.main import app  # your FastAPI gateway app
 
 USERS_BASE = "http://users:8080"
@@ -89,3 +91,148 @@ async def test_gateway_passes_query_params():
         assert route.called
         # Last downstream request URL should include the querystring
         assert str(route.calls.last.request.url).endswith("/users/?limit=2")
+
+
+async def _open_stream(path, headers=()):
+    """Start a request against the ASGI app directly and return its task and sent-message queue.
+
+    httpx's ASGI transport would buffer the whole body, hiding whether chunks are relayed incrementally.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"test"), *headers],
+        "client": ("test", 1234),
+        "server": ("test", 80),
+    }
+    sent = asyncio.Queue()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # Client stays connected until the response completes
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return asyncio.create_task(app(scope, receive, sent.put)), sent
+
+
+async def _read_rest(sent):
+    body = b""
+    while True:
+        message = await asyncio.wait_for(sent.get(), 1)
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+def _held_stream(first, release):
+    async def body():
+        yield first
+        await release.wait()
+    return body()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_gateway_streams_payment_events_incrementally():
+    async with LifespanManager(app):
+        first = b'id: 3\nevent: status\ndata: {"payment_id": 7, "status": "pending"}\n\n'
+        second = b'id: 4\nevent: status\ndata: {"payment_id": 7, "status": "completed"}\n\n'
+        release = asyncio.Event()
+
+        async def upstream_body():
+            yield first
+            await release.wait()
+            yield second
+
+        route = respx.get(f"{PAYMENTS_BASE}/payments/7/events").mock(
+            return_value=httpx.Response(200, content=upstream_body(), headers={"content-type": "text/event-stream"})
+        )
+
+        task, sent = await _open_stream(
+            "/payments/7/events", [(b"last-event-id", b"2"), (b"accept-encoding", b"gzip")]
+        )
+        start = await asyncio.wait_for(sent.get(), 1)
+        assert start["status"] == 200
+        assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+
+        # The first event reaches the client while upstream is still holding the second
+        chunk = await asyncio.wait_for(sent.get(), 1)
+        assert chunk["body"] == first
+        assert not release.is_set()
+
+        release.set()
+        assert await _read_rest(sent) == second
+        await task
+
+        upstream_headers = route.calls.last.request.headers
+        # Resume cursor is passed through; compression is disabled for the raw relay
+        assert upstream_headers["last-event-id"] == "2"
+        assert upstream_headers["accept-encoding"] == "identity"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_gateway_caps_event_streams_without_starving_other_routes(monkeypatch):
+    monkeypatch.setattr(gateway, "MAX_EVENT_STREAMS", 1)
+    async with LifespanManager(app):
+        app.state.http = httpx.AsyncClient()
+
+        release = asyncio.Event()
+        respx.get(f"{PAYMENTS_BASE}/payments/7/events").mock(
+            side_effect=lambda request: httpx.Response(
+                200, content=_held_stream(b": heartbeat\n\n", release), headers={"content-type": "text/event-stream"}
+            )
+        )
+        respx.get(f"{USERS_BASE}/users/1").mock(
+            return_value=httpx.Response(200, json={"id": 1, "username": "alice"})
+        )
+
+        # The only stream slot is held open
+        task, sent = await _open_stream("/payments/7/events")
+        assert (await asyncio.wait_for(sent.get(), 1))["status"] == 200
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            res = await ac.get("/payments/7/events")
+            assert res.status_code == 503
+            assert res.json() == {"detail": "Too many open event streams"}
+
+            # Plain routes use their own pool and are unaffected
+            res = await asyncio.wait_for(ac.get("/users/1"), 1)
+            assert res.status_code == 200
+
+        # Closing the stream frees its slot
+        release.set()
+        await _read_rest(sent)
+        await task
+        task, sent = await _open_stream("/payments/7/events")
+        assert (await asyncio.wait_for(sent.get(), 1))["status"] == 200
+        await _read_rest(sent)
+        await task
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_gateway_returns_json_for_failed_payment_events():
+    async with LifespanManager(app):
+        app.state.http = httpx.AsyncClient()
+
+        respx.get(f"{PAYMENTS_BASE}/payments/999/events").mock(
+            return_value=httpx.Response(404, json={"detail": "Payment not found"})
+        )
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            res = await ac.get("/payments/999/events")
+        assert res.status_code == 404
+        assert res.headers["content-type"] == "application/json"
+        assert res.json() == {"detail": "Payment not found"}
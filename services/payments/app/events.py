@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import json
+import secrets
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Iterable, Optional, Set
+
+# Tunables: how many past events are kept for Last-Event-ID resume, how many
+# undelivered events a single subscriber may hold before it is dropped, and how
+# often an idle stream emits a heartbeat.
+HISTORY_SIZE = 1024
+SUBSCRIBER_QUEUE_SIZE = 64
+HEARTBEAT_INTERVAL = 15.0
+
+
+@dataclass(frozen=True)
+class PaymentEvent:
+    # "<epoch>-<seq>"; the seq is kept separately for ordering within a hub
+    id: str
+    payment_id: int
+    order_id: int
+    amount: float
+    status: str
+    seq: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "payment_id": self.payment_id,
+            "order_id": self.order_id,
+            "amount": self.amount,
+            "status": self.status,
+        }
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: status\ndata: {json.dumps(self.to_dict())}\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    payment_ids: Optional[Set[int]] = None
+    statuses: Optional[Set[str]] = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+    # History replayed on resume; it references events already held by the
+    # hub's ring buffer, so it does not count against the live queue bound
+    backlog: Deque[PaymentEvent] = field(default_factory=deque)
+    dropped: bool = False
+
+    def matches(self, event: PaymentEvent) -> bool:
+        if self.payment_ids is not None and event.payment_id not in self.payment_ids:
+            return False
+        if self.statuses is not None and event.status not in self.statuses:
+            return False
+        return True
+
+    def offer(self, event: PaymentEvent) -> bool:
+        """Enqueue without blocking; a full queue marks the subscriber as dropped."""
+        if self.dropped:
+            return False
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            # Discard queued events and wake the consumer so it notices the drop
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+        return True
+
+    async def next(self, timeout: float) -> Optional[PaymentEvent]:
+        """Return the next event, or None on heartbeat timeout / drop."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """In-process pub/sub for payment status transitions."""
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        # Sequence numbers restart with every process, so ids carry a per-hub
+        # epoch and cursors issued by another process are never resumable
+        self.epoch = secrets.token_hex(6)
+        self._seqs = itertools.count(1)
+        self.last_seq = 0
+        self._history: Deque[PaymentEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def last_id(self) -> str:
+        return f"{self.epoch}-{self.last_seq}"
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, payment_id: int, order_id: int, amount: float, status: str) -> PaymentEvent:
+        seq = next(self._seqs)
+        event = PaymentEvent(f"{self.epoch}-{seq}", payment_id, order_id, amount, status, seq)
+        self.last_seq = seq
+        self._history.append(event)
+        for sub in list(self._subscribers):
+            if sub.matches(event) and not sub.offer(event):
+                self._subscribers.discard(sub)
+        return event
+
+    def _parse(self, event_id: str) -> Optional[int]:
+        """Return the seq of an id issued by this hub, else None."""
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def can_resume(self, last_event_id: str) -> bool:
+        """Whether every event after last_event_id is still in history."""
+        seq = self._parse(last_event_id)
+        if seq is None:
+            return False
+        oldest = self._history[0].seq if self._history else self.last_seq + 1
+        return oldest - 1 <= seq <= self.last_seq
+
+    def subscribe(
+        self,
+        payment_ids: Optional[Iterable[int]] = None,
+        statuses: Optional[Iterable[str]] = None,
+        last_event_id: Optional[str] = None,
+    ) -> Subscription:
+        sub = Subscription(
+            payment_ids=set(payment_ids) if payment_ids else None,
+            statuses=set(statuses) if statuses else None,
+        )
+        seq = self._parse(last_event_id) if last_event_id is not None else None
+        if seq is not None:
+            sub.backlog.extend(e for e in self._history if e.seq > seq and sub.matches(e))
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    async def stream(self, sub: Subscription, heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncIterator[Optional[PaymentEvent]]:
+        """Yield events for a subscription; None is yielded for each heartbeat."""
+        try:
+            while sub.backlog and not sub.dropped:
+                yield sub.backlog.popleft()
+            while True:
+                event = await sub.next(heartbeat)
+                if sub.dropped:
+                    return
+                yield event
+        finally:
+            self.unsubscribe(sub)
+
+
+hub = EventHub()
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 from sqlalchemy import Column, Integer, String, Float, create_engine, MetaData
@@ -7,6 +8,8 @@ import databases
 from pathlib import Path
 from contextlib import asynccontextmanager
 
+from .events import PaymentEvent, hub
+
 # Ensure ./data directory exists
 Path("./data").mkdir(parents=True, exist_ok=True)
 
@@ -86,6 +89,8 @@ async def update_payment(payment_id: int, payload: PaymentUpdate):
     if not existing:
         raise HTTPException(status_code=404, detail="Payment not found")
     await database.execute(Payment.__table__.update().where(Payment.id == payment_id).values(**payload.model_dump()))
+    if payload.status != existing["status"]:
+        hub.publish(payment_id, payload.order_id, payload.amount, payload.status)
     return PaymentResponse(id=payment_id, **payload.model_dump())
 
 @app.delete("/payments/{payment_id}", status_code=204)
@@ -103,6 +108,8 @@ async def process_payment(payment_id: int):
         raise HTTPException(status_code=404, detail="Payment not found")
     new_status = "completed" if payment["amount"] > 0 else "failed"
     await database.execute(Payment.__table__.update().where(Payment.id == payment_id).values(status=new_status))
+    if new_status != payment["status"]:
+        hub.publish(payment_id, payment["order_id"], payment["amount"], new_status)
     return PaymentResponse(id=payment_id, order_id=payment["order_id"], amount=payment["amount"], status=new_status)
 
 @app.post("/payments/{payment_id}/refund", response_model=PaymentResponse)
@@ -113,8 +120,74 @@ async def refund_payment(payment_id: int):
     if payment["status"] != "completed":
         raise HTTPException(status_code=400, detail="Only completed payments can be refunded")
     await database.execute(Payment.__table__.update().where(Payment.id == payment_id).values(status="refunded"))
+    hub.publish(payment_id, payment["order_id"], payment["amount"], "refunded")
     return PaymentResponse(id=payment_id, order_id=payment["order_id"], amount=payment["amount"], status="refunded")
 
+# Status streams: push transitions instead of polling GET /payments/{id}
+@app.get("/payments/{payment_id}/events")
+async def payment_events(payment_id: int, last_event_id: Optional[str] = Header(None)):
+    # A cursor the hub cannot replay from (too old, or from before a restart) gets a snapshot
+    resume = last_event_id is not None and hub.can_resume(last_event_id)
+    # Subscribe before reading the row so no transition slips in between
+    sub = hub.subscribe(payment_ids=[payment_id], last_event_id=last_event_id if resume else None)
+    snapshot_id = hub.last_id
+    row = await database.fetch_one(Payment.__table__.select().where(Payment.id == payment_id))
+    if not row:
+        hub.unsubscribe(sub)
+        raise HTTPException(status_code=404, detail="Payment not found")
+
+    async def stream():
+        try:
+            if not resume:
+                yield PaymentEvent(
+                    snapshot_id, row["id"], row["order_id"], row["amount"], row["status"] or "pending"
+                ).to_sse()
+            async for event in hub.stream(sub):
+                yield event.to_sse() if event else ": heartbeat\n\n"
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.websocket("/payments/events/ws")
+async def payment_events_ws(
+    websocket: WebSocket,
+    payment_id: Optional[List[int]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    last_event_id: Optional[str] = Query(None),
+):
+    await websocket.accept()
+    resume = last_event_id is not None and hub.can_resume(last_event_id)
+    sub = hub.subscribe(payment_ids=payment_id, statuses=status, last_event_id=last_event_id if resume else None)
+    snapshot_id = hub.last_id
+    try:
+        if not resume and payment_id:
+            # No replayable cursor: send the current state of the watched payments,
+            # so a transition published just before connecting is not missed
+            rows = await database.fetch_all(Payment.__table__.select().where(Payment.id.in_(payment_id)))
+            for r in rows:
+                snapshot = PaymentEvent(snapshot_id, r["id"], r["order_id"], r["amount"], r["status"] or "pending")
+                if sub.matches(snapshot):
+                    await websocket.send_json({"type": "snapshot", **snapshot.to_dict()})
+        elif not resume and last_event_id is not None:
+            # Events since the cursor are gone; let the client refetch via GET /payments/?status=...
+            await websocket.send_json({"type": "resync", "id": snapshot_id})
+        async for event in hub.stream(sub):
+            if event is None:
+                await websocket.send_json({"type": "heartbeat"})
+            else:
+                await websocket.send_json({"type": "status", **event.to_dict()})
+        # Stream only ends when the subscriber fell behind; client should resume via last_event_id
+        await websocket.close(code=1013, reason="Subscriber too slow")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(sub)
+
 @app.get("/healthz")
 async def healthz():
     return {"status": "ok"}
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.main import app, engine, Payment
+from app.events import EventHub, SUBSCRIBER_QUEUE_SIZE, hub
+
+
+class _SSEStream:
+    """Drive the ASGI app directly so an endless SSE response can be read incrementally."""
+
+    def __init__(self, path, headers=()):
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"test"), *[(k.lower().encode(), v.encode()) for k, v in headers]],
+            "client": ("test", 1234),
+            "server": ("test", 80),
+        }
+        self.status = None
+        self.headers = {}
+        self.body = b""
+        self._requested = False
+        self._disconnect = asyncio.Event()
+        self._chunk = asyncio.Event()
+
+    async def _receive(self):
+        if not self._requested:
+            self._requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            self.body += message.get("body", b"")
+        self._chunk.set()
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(app(self.scope, self._receive, self._send))
+        return self
+
+    async def __aexit__(self, *exc):
+        self._disconnect.set()
+        await asyncio.wait_for(self._task, 1)
+
+    def _events(self):
+        events = []
+        for block in self.body.decode().split("\n\n")[:-1]:
+            fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+            if fields:
+                events.append(fields)
+        return events
+
+    async def read(self, count):
+        while len(self._events()) < count:
+            self._chunk.clear()
+            await asyncio.wait_for(self._chunk.wait(), 1)
+        return self._events()[:count]
+
+@pytest.mark.asyncio
+async def test_hub_filters_by_payment_and_status():
+    h = EventHub()
+    by_id = h.subscribe(payment_ids=[1])
+    by_status = h.subscribe(statuses=["refunded"])
+
+    h.publish(1, 10, 5.0, "completed")
+    h.publish(2, 20, 5.0, "refunded")
+
+    assert by_id.queue.get_nowait().payment_id == 1
+    assert by_id.queue.empty()
+    assert by_status.queue.get_nowait().payment_id == 2
+    assert by_status.queue.empty()
+
+@pytest.mark.asyncio
+async def test_hub_resumes_from_last_event_id():
+    h = EventHub()
+    first = h.publish(1, 10, 5.0, "completed")
+    h.publish(1, 10, 5.0, "refunded")
+
+    sub = h.subscribe(payment_ids=[1], last_event_id=first.id)
+    assert [e.status for e in sub.backlog] == ["refunded"]
+    assert sub.queue.empty()
+
+@pytest.mark.asyncio
+async def test_hub_replays_backlog_larger_than_queue():
+    h = EventHub()
+    for i in range(SUBSCRIBER_QUEUE_SIZE + 36):
+        h.publish(i, i, 1.0, "completed")
+
+    sub = h.subscribe(statuses=["completed"], last_event_id=f"{h.epoch}-0")
+    assert not sub.dropped
+    stream = h.stream(sub, heartbeat=0.01)
+    replayed = [await stream.__anext__() for _ in range(SUBSCRIBER_QUEUE_SIZE + 36)]
+    assert [e.seq for e in replayed] == list(range(1, SUBSCRIBER_QUEUE_SIZE + 37))
+    # Live delivery continues after the replay
+    h.publish(1, 1, 1.0, "completed")
+    assert (await stream.__anext__()).id == h.last_id
+    await stream.aclose()
+
+@pytest.mark.asyncio
+async def test_hub_can_resume():
+    h = EventHub(history_size=2)
+    assert h.can_resume(h.last_id)
+    for i in range(3):
+        h.publish(i, i, 1.0, "completed")
+
+    # History now holds seqs 2 and 3
+    assert not h.can_resume(f"{h.epoch}-0")
+    assert h.can_resume(f"{h.epoch}-1")
+    assert h.can_resume(f"{h.epoch}-3")
+    assert not h.can_resume(f"{h.epoch}-4")
+    assert not h.can_resume("garbage")
+
+@pytest.mark.asyncio
+async def test_hub_rejects_cursor_from_earlier_instance():
+    old = EventHub()
+    old.publish(1, 1, 1.0, "pending")
+    cursor = old.last_id
+    old.publish(1, 1, 1.0, "completed")
+
+    # After a restart the new hub counts past the old cursor's seq
+    new = EventHub()
+    for i in range(10):
+        new.publish(i + 2, i, 1.0, "completed")
+    assert not new.can_resume(cursor)
+    assert not new.subscribe(last_event_id=cursor).backlog
+
+@pytest.mark.asyncio
+async def test_hub_drops_slow_consumer():
+    h = EventHub()
+    sub = h.subscribe()
+    for i in range(SUBSCRIBER_QUEUE_SIZE + 1):
+        h.publish(i, i, 1.0, "completed")
+
+    assert sub.dropped
+    assert h.subscriber_count == 0
+    events = [e async for e in h.stream(sub, heartbeat=0.1)]
+    assert events == []
+
+@pytest.mark.asyncio
+async def test_hub_stream_heartbeat():
+    h = EventHub()
+    sub = h.subscribe()
+    stream = h.stream(sub, heartbeat=0.01)
+    assert await stream.__anext__() is None
+    h.publish(1, 10, 5.0, "completed")
+    assert (await stream.__anext__()).status == "completed"
+    await stream.aclose()
+    assert h.subscriber_count == 0
+
+@pytest.mark.asyncio
+async def test_process_and_refund_publish_transitions():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/payments/", json={"order_id": 7, "amount": 20.0})
+        pid = resp.json()["id"]
+
+        sub = hub.subscribe(payment_ids=[pid])
+        try:
+            await ac.post(f"/payments/{pid}/process")
+            await ac.post(f"/payments/{pid}/refund")
+            statuses = [
+                (await asyncio.wait_for(sub.queue.get(), 1)).status for _ in range(2)
+            ]
+        finally:
+            hub.unsubscribe(sub)
+        assert statuses == ["completed", "refunded"]
+
+        resp = await ac.get("/payments/999999/events")
+        assert resp.status_code == 404
+        assert hub.subscriber_count == 0
+
+        await ac.delete(f"/payments/{pid}")
+
+@pytest.mark.asyncio
+async def test_sse_sends_snapshot_then_transitions():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        pid = (await ac.post("/payments/", json={"order_id": 8, "amount": 30.0})).json()["id"]
+
+        async with _SSEStream(f"/payments/{pid}/events") as sse:
+            snapshot, = await sse.read(1)
+            assert sse.status == 200
+            assert sse.headers["content-type"].startswith("text/event-stream")
+            assert snapshot["event"] == "status"
+            assert json.loads(snapshot["data"])["status"] == "pending"
+
+            await ac.post(f"/payments/{pid}/process")
+            _, update = await sse.read(2)
+            data = json.loads(update["data"])
+            assert data["status"] == "completed"
+            assert update["id"] == data["id"] == hub.last_id
+
+        assert hub.subscriber_count == 0
+        await ac.delete(f"/payments/{pid}")
+
+@pytest.mark.asyncio
+async def test_sse_resumes_from_last_event_id():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        pid = (await ac.post("/payments/", json={"order_id": 9, "amount": 30.0})).json()["id"]
+        await ac.post(f"/payments/{pid}/process")
+        cursor = hub.last_id
+        await ac.post(f"/payments/{pid}/refund")
+
+        # Resumable cursor: replay only what was missed, no snapshot
+        async with _SSEStream(f"/payments/{pid}/events", [("Last-Event-ID", cursor)]) as sse:
+            event, = await sse.read(1)
+            assert event["id"] == hub.last_id != cursor
+            assert json.loads(event["data"])["status"] == "refunded"
+
+        # Cursor issued by an earlier hub instance: fall back to a snapshot
+        stale = f"{EventHub().epoch}-{hub.last_seq}"
+        async with _SSEStream(f"/payments/{pid}/events", [("Last-Event-ID", stale)]) as sse:
+            event, = await sse.read(1)
+            assert event["id"] == hub.last_id
+            assert json.loads(event["data"])["status"] == "refunded"
+
+        await ac.delete(f"/payments/{pid}")
+
+def test_websocket_filters_and_frames():
+    with TestClient(app) as client:
+        a, b, c, d = (client.post("/payments/", json={"order_id": 10, "amount": 5.0}).json()["id"] for _ in range(4))
+        # Settles before the client subscribes; only the snapshot can report it
+        client.post(f"/payments/{a}/process")
+
+        with client.websocket_connect(f"/payments/events/ws?payment_id={a}&payment_id={b}&status=completed") as ws:
+            snapshot_id = hub.last_id
+            client.post(f"/payments/{c}/process")  # not subscribed
+            client.post(f"/payments/{a}/refund")  # status filtered out
+            client.post(f"/payments/{b}/process")
+
+            snapshot, frame = ws.receive_json(), ws.receive_json()
+            assert (snapshot["type"], snapshot["payment_id"], snapshot["status"]) == ("snapshot", a, "completed")
+            assert snapshot["id"] == snapshot_id
+            assert (frame["type"], frame["payment_id"], frame["status"]) == ("status", b, "completed")
+
+        # Unresumable cursor with payment ids: snapshot of the watched payments
+        stale = f"{EventHub().epoch}-1"
+        with client.websocket_connect(f"/payments/events/ws?payment_id={a}&last_event_id={stale}") as ws:
+            frame = ws.receive_json()
+            assert (frame["type"], frame["payment_id"], frame["status"]) == ("snapshot", a, "refunded")
+
+        # Unresumable cursor without payment ids: a single resync frame, no table scan
+        with client.websocket_connect(f"/payments/events/ws?status=completed&last_event_id={stale}") as ws:
+            assert ws.receive_json() == {"type": "resync", "id": hub.last_id}
+            client.post(f"/payments/{d}/process")
+            frame = ws.receive_json()
+            assert (frame["type"], frame["payment_id"]) == ("status", d)
+
+        for pid in (a, b, c, d):
+            client.delete(f"/payments/{pid}")
+
+def test_websocket_snapshot_treats_null_status_as_pending():
+    with TestClient(app) as client:
+        with engine.begin() as conn:
+            pid = conn.execute(Payment.__table__.insert().values(order_id=11, amount=5.0, status=None)).inserted_primary_key[0]
+
+        with client.websocket_connect(f"/payments/events/ws?payment_id={pid}&status=pending") as ws:
+            frame = ws.receive_json()
+            assert (frame["type"], frame["payment_id"], frame["status"]) == ("snapshot", pid, "pending")
+
+        client.delete(f"/payments/{pid}")
+
+def test_websocket_closes_slow_consumer():
+    with TestClient(app) as client:
+        with client.websocket_connect("/payments/events/ws?status=completed") as ws:
+            # Publish in a single loop turn so the endpoint cannot drain in between
+            client.portal.call(
+                lambda: [hub.publish(0, 0, 1.0, "completed") for _ in range(SUBSCRIBER_QUEUE_SIZE + 1)]
+            )
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+            assert exc.value.code == 1013